@@ -8,14 +8,19 @@
 # System wide imports
 # -------------------
 
+import os
+import re
+import sys
+import copy
 import asyncio
 import logging
-import tomllib
 import signal
+import warnings
 
+from pathlib import Path
 from logging import Logger
 from dataclasses import dataclass
-from typing import Any, Mapping, Tuple
+from typing import Any, Mapping
 from argparse import ArgumentParser, Namespace
 
 # ---------------------------
@@ -26,7 +31,17 @@ from argparse import ArgumentParser, Namespace
 from lica.asyncio.cli import execute
 from lica.validators import vfile
 
-from pubsub import pub
+try:
+    # libuv based event loop, not available on Windows
+    import uvloop
+except ImportError:
+    uvloop = None  # type: ignore[assignment]
+
+try:
+    # Rust-backed TOML parser, much faster than the pure-Python stdlib one
+    import rtoml as toml
+except ImportError:
+    import tomllib as toml  # type: ignore[no-redef]
 
 # --------------
 # local imports
@@ -36,7 +51,6 @@ from . import __version__
 
 # from .. import mqtt, http, dbase, stats, filtering
 from . import http, mqtt
-from .constants import Topic
 from .logger import LogSpace
 from .model import PhotometerInfo
 from .photometer import Photometer
@@ -47,8 +61,8 @@ from .photometer import Photometer
 class State:
     config_path: str = None
     options: dict[str, Any] = None
-    queue: asyncio.PriorityQueue = None
-    reloaded: bool = False
+    queue: mqtt.PublishQueue = None
+    reload_event: asyncio.Event = None
 
 
 # ----------------
@@ -58,6 +72,12 @@ class State:
 log = logging.getLogger(LogSpace.CLIENT.value)
 state = State()
 
+# Photometer sections within the [tess] table
+PHOTOMETER_SECTION = re.compile(r"^stars", re.IGNORECASE)
+
+# Parsed config files, keyed by path -> ((mtime_ns, size), options)
+_toml_cache: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+
 
 # ------------------
 # Auxiliar functions
@@ -65,39 +85,53 @@ state = State()
 
 
 def load_config(path: str) -> dict[str, Any]:
-    with open(path, "rb") as config_file:
-        return tomllib.load(config_file)
-
-
-def get_photometers_info(config_options: Mapping) -> list[Tuple[str, PhotometerInfo]]:
+    """Parse the TOML config file, unless unchanged since the last time it was read.
+    Always returns a fresh copy so that callers may freely mutate it."""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _toml_cache.get(path)
+    if cached is None or cached[0] != key:
+        content = Path(path).read_bytes().decode("utf-8")
+        cached = _toml_cache[path] = (key, toml.loads(content))
+    return copy.deepcopy(cached[1])
+
+
+def get_photometers_info(config_options: Mapping) -> list[PhotometerInfo]:
     return [
         # PhotometerInfo validates input data from config.toml
-        PhotometerInfo(
-            endpoint=info["endpoint"],
-            log_level=info["log_level"],
-            period=info["period"],
-            name=name,
-            mac_address=info["mac_address"],
-            model=info["model"],
-            firmware=info.get("firmware"),
-            zp1=info["zp1"],
-            filter1=info["filter1"],
-            offset1=info["offset1"],
-            zp2=info.get("zp2"),
-            filter2=info.get("filter2"),
-            offset2=info.get("offset2"),
-            zp3=info.get("zp3"),
-            filter3=info.get("filter3"),
-            offset3=info.get("offset3"),
-            zp4=info.get("zp4"),
-            filter4=info.get("filter4"),
-            offset4=info.get("offset4"),
-        )
-        for name, info in state.options["tess"].items()
-        if name.lower().startswith("stars")
+        PhotometerInfo.model_validate({**info, "name": name})
+        for name, info in config_options.items()
+        if PHOTOMETER_SECTION.match(name)
     ]
 
 
+def signal_reload() -> None:
+    """SIGHUP handler, runs in the event loop context"""
+    state.reload_event.set()
+
+
+# ---------------
+# The reload task
+# ---------------
+
+
+async def reload_monitor() -> None:
+    """Sleeps until a reload is requested, then re-reads the config file"""
+    while True:
+        await state.reload_event.wait()
+        state.reload_event.clear()
+        log.info("Reloading configuration from %s", state.config_path)
+        try:
+            options = load_config(state.config_path)
+            http.on_client_reload(options["http"])
+            mqtt.on_client_reload(options["mqtt"])
+        except Exception as e:
+            # A bad reload must never kill the running publisher
+            log.error("Config file not reloaded: %s", e)
+            continue
+        state.options = options
+
+
 # ================
 # MAIN ENTRY POINT
 # ================
@@ -107,12 +141,18 @@ async def cli_main(args: Namespace) -> None:
     global state
     state.config_path = args.config
     state.options = load_config(state.config_path)
-    state.queue = asyncio.PriorityQueue(maxsize=state.options["tess"]["qsize"])
-    phot_infos = get_photometers_info(state.options["tess"].items())
+    state.queue = mqtt.PublishQueue(maxsize=state.options["tess"]["qsize"])
+    phot_infos = get_photometers_info(state.options["tess"])
     photometers = [Photometer(info=info, mqtt_queue=state.queue) for info in phot_infos]
+    state.reload_event = asyncio.Event()
+    if hasattr(signal, "SIGHUP"):  # Not available on Windows
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, signal_reload)
     try:
         async with asyncio.TaskGroup() as tg:
-            tg.create_task(http.admin(state.options["http"]))
+            tg.create_task(reload_monitor())
+            tg.create_task(
+                http.admin(state.options["http"], ploggers=[phot.log for phot in photometers])
+            )
             tg.create_task(mqtt.publisher(state.options["mqtt"], state.queue))
             for phot in photometers:
                 tg.create_task(phot.task())
@@ -133,8 +173,22 @@ def add_args(parser: ArgumentParser) -> None:
     )
 
 
+def install_uvloop() -> None:
+    """Makes asyncio.run() inside lica's execute() create uvloop event loops.
+    execute() does not take a loop factory, so the event loop policy is the only hook.
+    The policy API is deprecated since Python 3.14 and removed in 3.16,
+    where the default event loop is used instead."""
+    if uvloop is None or sys.version_info >= (3, 16):
+        return
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 def main():
     """The main entry point specified by pyproject.toml"""
+    # Must be installed before execute() creates the event loop
+    install_uvloop()
     execute(
         main_func=cli_main,
         add_args_func=add_args,
@@ -21,13 +21,6 @@ class Model(StrEnum):
     TESS4C = "TESS4C"
     TESSWDL = "TESS-WDL"
 
-  
-class Topic(StrEnum):
-    CLIENT_STATS = "client.stats"
-    CLIENT_RELOAD = "client.reload"
-    CLIENT_PAUSE = "client.pause"
-    CLIENT_RESUME = "client.resume"
-
 
 DEFAULT_FILTER = "UV/IR-740"
 DEFAULT_AZIMUTH = 0.0
@@ -9,23 +9,27 @@
 # -------------------
 
 import logging
-from typing import Any
-from dataclasses import dataclass
+from logging import Logger
+from typing import Any, Iterable, Optional
+from dataclasses import dataclass, asdict
 
 # ---------------------------
 # Third-party library imports
 # ----------------------------
 
 import decouple
+import orjson
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 
 
 # --------------
 # local imports
 # -------------
 
-from .logger import level, LogSpace
+from .logger import level, level_name, LogSpace, LogSpaceName, LogLevelInfo, PhotLogLevelInfo
+from .model import Stars4AllName
+from .mqtt import stats
 
 
 # -------
@@ -38,10 +42,19 @@ class State:
     host: str = decouple.config("ADMIN_HTTP_LISTEN_ADDR")
     port: int = decouple.config("ADMIN_HTTP_PORT", cast=int)
     log_level: int = 0
+    fingerprint: Optional[bytes] = None
 
     def update(self, options: dict[str, Any]) -> None:
-        """Updates the mutable state"""
-        self.log_level = level(options["log_level"])
+        """Updates the mutable state, unless options are the same as last time"""
+        # Serialized rather than hashed, as TOML arrays and tables are not hashable
+        fingerprint = orjson.dumps(options, option=orjson.OPT_SORT_KEYS)
+        if fingerprint == self.fingerprint:
+            return
+        # Validate everything before changing anything
+        log_level = level(options["log_level"])
+        self.log_level = log_level
+        log.setLevel(self.log_level)
+        self.fingerprint = fingerprint
 
 
 # ----------------
@@ -53,20 +66,35 @@ log = logging.getLogger(LogSpace.HTTP.value)
 app = FastAPI()
 state = State()
 
+# Loggers handled by the logger API, fetched once instead of on every request
+_logger_cache: dict[str, Logger] = {name.value: logging.getLogger(name.value) for name in LogSpace}
+_plogger_cache: dict[str, Logger] = dict()
+
+
+# ------------------
+# Auxiliar functions
+# ------------------
+
+
+def on_client_reload(options: dict[str, Any]) -> None:
+    state.update(options)
+    log.info("Reloaded configuration")
+
 
 # -------------------------
 # The HTTP server main task
 # -------------------------
 
 
-async def admin(options: dict[str, Any]) -> None:
+async def admin(options: dict[str, Any], ploggers: Iterable[Logger]) -> None:
     global state
     state.update(options)
-    log.setLevel(state.log_level)
+    _plogger_cache.update((plog.name, plog) for plog in ploggers)
     config = uvicorn.Config(
         f"{__name__}:app",
         host=state.host,
         port=state.port,
+        http="httptools",
         log_level="error",
         use_colors=False,
     )
@@ -85,6 +113,79 @@ async def root():
     return {"message": "I'm alive"}
 
 
+@app.get("/v1/stats")
+async def get_stats():
+    log.info("Received stats request")
+    stats.show()
+    return asdict(stats)
+
+
+@app.post("/v1/stats/reset")
+async def reset_stats():
+    """Returns the counters as they were just before resetting them"""
+    log.info("Received stats reset request")
+    stats.show()
+    result = asdict(stats)
+    stats.reset()
+    return result
+
+
 # ===============
 # TASK LOGGER API
 # ===============
+
+
+@app.get("/v1/loggers")
+async def loggers():
+    log.info("Received get all loggers request")
+    return [
+        LogLevelInfo(name=name, level=level_name(logger.level))
+        for name, logger in _logger_cache.items()
+    ]
+
+
+@app.get("/v1/loggers/{name}")
+async def get_logger_level(name: LogSpaceName):
+    log.info("Received get logger %s request", name)
+    return LogLevelInfo(name=name, level=level_name(_logger_cache[name].level))
+
+
+@app.put("/v1/loggers")
+async def set_logger_level(info: LogLevelInfo):
+    log.info("Received set logger %s level to %s request", info.name, info.level)
+    _logger_cache[info.name].setLevel(level(info.level))
+    return info
+
+
+# =====================
+# PHOTOMETER LOGGER API
+# =====================
+
+
+def get_plogger(name: str) -> Logger:
+    try:
+        return _plogger_cache[name]
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Photometer {name} not found")
+
+
+@app.get("/v1/ploggers")
+async def ploggers():
+    log.info("Received get all photometer loggers request")
+    return [
+        PhotLogLevelInfo(name=name, level=level_name(logger.level))
+        for name, logger in _plogger_cache.items()
+    ]
+
+
+@app.get("/v1/ploggers/{name}")
+async def get_plogger_level(name: Stars4AllName):
+    log.info("Received get photometer logger %s request", name)
+    return PhotLogLevelInfo(name=name, level=level_name(get_plogger(name).level))
+
+
+@app.put("/v1/ploggers")
+async def set_plogger_level(info: PhotLogLevelInfo):
+    log.info("Received set photometer logger %s level to %s request", info.name, info.level)
+    get_plogger(info.name).setLevel(level(info.level))
+    return info
@@ -32,7 +32,11 @@ def level(level_str: str) -> int:
 
 
 def level_name(level: int) -> str:
-    return Levels(level).name
+    """Levels set from outside this API (i.e. 15) are named after the nearest lower one"""
+    try:
+        return Levels(level).name
+    except ValueError:
+        return max((lev for lev in Levels if lev.value <= level), key=lambda lev: lev.value).name
 
 
 # Log NameSpaces
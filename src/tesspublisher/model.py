@@ -8,7 +8,7 @@
 import re
 import json
 from datetime import datetime, timezone, timedelta
-from typing import Annotated, Union, Optional
+from typing import Annotated, Any, Callable, Union, Optional
 from pydantic import AfterValidator, BeforeValidator, BaseModel
 from .constants import Model as PhotometerModel
 
@@ -20,6 +20,11 @@ OFFSET_LOW = 0
 OFFSET_HIGH = 1
 
 STARS4ALL_NAME_PATTERN = re.compile(r"^stars\d{1,7}$")
+# One MAC address octet, leading zeros allowed as int(x, 16) used to
+MAC_OCTET_PATTERN = re.compile(r"0*[0-9A-Fa-f]{1,2}")
+
+# Shape of the TSTAMP_FORMAT strings below, parsed much faster by datetime.fromisoformat()
+TSTAMP_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(Z|[+-]\d{2}:?\d{2})?$")
 
 # Sequence of possible timestamp formats
 TSTAMP_FORMAT = (
@@ -39,6 +44,15 @@ def is_datetime(value: Union[str, datetime, None]) -> datetime:
         return value
     if not isinstance(value, str):
         raise ValueError("tstamp must be a string or datetime.")
+    if TSTAMP_PATTERN.match(value):
+        try:
+            tstamp = datetime.fromisoformat(value)
+        except ValueError:
+            pass
+        else:
+            if tstamp.tzinfo is None:
+                return tstamp.replace(tzinfo=timezone.utc)
+            return tstamp.astimezone(timezone.utc)
     for i, fmt in enumerate(TSTAMP_FORMAT):
         try:
             if i < 4:
@@ -51,19 +65,15 @@ def is_datetime(value: Union[str, datetime, None]) -> datetime:
 
 
 def is_mac_address(value: str) -> str:
-    """'If this doesn't look like a MAC address at all, simple returns it.
-    Otherwise properly formats it. Do not allow for invalid digits.
+    """Properly formats a MAC address as six upper case, zero padded octets.
+    Blanks around octets are ignored. Do not allow for invalid digits.
     """
-    try:
-        mac_parts = value.split(":")
-        if len(mac_parts) != 6:
-            raise ValueError("Invalid MAC: %s" % value)
-        corrected_mac = ":".join(f"{int(x, 16):02X}" for x in mac_parts)
-    except ValueError:
+    if not isinstance(value, str):
         raise ValueError("Invalid MAC: %s" % value)
-    except AttributeError:
+    octets = [octet.strip() for octet in value.split(":")]
+    if len(octets) != 6 or not all(MAC_OCTET_PATTERN.fullmatch(octet) for octet in octets):
         raise ValueError("Invalid MAC: %s" % value)
-    return corrected_mac
+    return ":".join(octet.lstrip("0").zfill(2).upper() for octet in octets)
 
 
 def is_valid_offset(value: float) -> float:
@@ -81,20 +91,16 @@ def is_stars4all_name(value: str) -> str:
 
 
 def is_zero_point(value: Union[str, int, float]) -> float:
-    if isinstance(value, int):
-        if not (ZP_LOW <= value <= ZP_HIGH):
-            raise ValueError(f"Zero Point {value} out of bounds [{ZP_LOW}-{ZP_HIGH}]")
-        return value
-    elif isinstance(value, float):
-        if not (ZP_LOW <= value <= ZP_HIGH):
-            raise ValueError(f"Zero Point {value} out of bounds [{ZP_LOW}-{ZP_HIGH}]")
-        return value
-    elif isinstance(value, str):
-        value = float(value)
-        if not (ZP_LOW <= value <= ZP_HIGH):
-            raise ValueError(f"Zero Point {value} out of bounds [{ZP_LOW}-{ZP_HIGH}]")
-        return value
-    raise ValueError(f"{value} has an unsupported type: {type(value)}")
+    try:
+        zp = float(value)
+    except TypeError:
+        raise ValueError(f"{value!r} has an unsupported type: {type(value)}")
+    except ValueError:
+        raise ValueError(f"Zero Point {value!r} is not a number")
+    if not (ZP_LOW <= zp <= ZP_HIGH):
+        raise ValueError(f"Zero Point {zp} out of bounds [{ZP_LOW}-{ZP_HIGH}]")
+    # Numbers keep their type, so that integer zero points are published as such
+    return zp if isinstance(value, str) else value
 
 
 def is_endpoint(value: str) -> str:
@@ -126,6 +132,42 @@ ZeroPointType = Annotated[Union[str, int, float], BeforeValidator(is_zero_point)
 TimestampType = Annotated[Union[str, datetime, None], BeforeValidator(is_datetime)]
 
 
+# --------------------------------
+# Register messages, one per model
+# --------------------------------
+
+
+def tess4c_register(info: "PhotometerInfo") -> dict[str, Any]:
+    return {
+        "rev": 3,
+        "name": info.name,
+        "mac": info.mac_address,
+        "firmware": info.firmware,
+        "F1": {"band": info.filter1, "calib": info.zp1},
+        "F2": {"band": info.filter2, "calib": info.zp2},
+        "F3": {"band": info.filter3, "calib": info.zp3},
+        "F4": {"band": info.filter4, "calib": info.zp4},
+    }
+
+
+def tessw_register(info: "PhotometerInfo") -> dict[str, Any]:
+    return {
+        "name": info.name,
+        "rev": 2,
+        "mac": info.mac_address,
+        "chan": "pruebas",
+        "calib": info.zp1,
+        "wdBm": 0,
+    }
+
+
+REGISTER_BUILDERS: dict[PhotometerModel, Callable[["PhotometerInfo"], dict[str, Any]]] = {
+    PhotometerModel.TESS4C: tess4c_register,
+    PhotometerModel.TESSW: tessw_register,
+    PhotometerModel.TESSWDL: tessw_register,
+}
+
+
 class PhotometerInfo(BaseModel):
     endpoint: EndpointType
     log_level: LogLevelType
@@ -147,29 +189,12 @@ class PhotometerInfo(BaseModel):
     filter4: Optional[str] = None
     offset4: Optional[FreqOffset] = None
 
-    def to_dict(self) -> str:
-        if self.model == PhotometerModel.TESS4C:
-            return {
-                "rev": 3,
-                "name": self.name,
-                "mac": self.mac_address,
-                "firmware": self.firmware,
-                "F1": {"band": self.filter1, "calib": self.zp1},
-                "F2": {"band": self.filter2, "calib": self.zp2},
-                "F3": {"band": self.filter3, "calib": self.zp3},
-                "F4": {"band": self.filter4, "calib": self.zp4},
-            }
-        elif self.model in (PhotometerModel.TESSW, PhotometerModel.TESSWDL):
-            return {
-                "name": self.name,
-                "rev": 2,
-                "mac": self.mac_address,
-                "chan": "pruebas",
-                "calib": self.zp1,
-                "wdBm": 0,
-            }
-        else:
-            raise ValueError(f"This photometer does not transmit: {PhotometerModel.TESSW.value}")
+    def to_dict(self) -> dict[str, Any]:
+        try:
+            builder = REGISTER_BUILDERS[self.model]
+        except KeyError:
+            raise ValueError(f"This photometer does not transmit: {self.model.value}")
+        return builder(self)
 
 
 __all__ = ["PhotometerInfo"]
@@ -8,12 +8,13 @@
 # System wide imports
 # -------------------
 
-import json
+import random
 import asyncio
+import collections
 import logging
 
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Coroutine, Optional, cast
 
 # ---------------------------
 # Third-party library imports
@@ -21,28 +22,105 @@ from typing import Any
 
 
 import decouple
+import orjson
 import aiomqtt
 from aiomqtt.client import ProtocolVersion
-from pubsub import pub
 
 # --------------
 # local imports
 # -------------
 
 from . import logger
-from .constants import Topic, MessagePriority
+from .constants import MessagePriority
 
 
 # ---------
 # CONSTANTS
 # ---------
 
+# Maximum number of queued messages published in one go
+BATCH_SIZE = 64
+
+# Default time (in seconds) to wait for more readings before publishing them together
+BATCH_DELAY = 0.05
+
+# Registrations must get through, readings are sent again every Tx period
+REGISTER_QOS = 1
+READINGS_QOS = 0
+
+# A publish not completed within this time (in seconds) forces a reconnection
+PUBLISH_TIMEOUT = 5.0
+
+# Reconnection backoff limits (in seconds)
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+# (priority, topic, payload) items handled by the PublishQueue
+Message = tuple[MessagePriority, Optional[str], bytes]
+
 
 # ------------------
 # Additional Classes
 # ------------------
 
 
+class PublishQueue:
+    """Queue of (priority, topic, payload) messages to publish.
+    Register messages are always delivered before any pending reading.
+    Only readings are bounded by maxsize, blocking their producers when full."""
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self.register: collections.deque[Message] = collections.deque()
+        self.readings: collections.deque[Message] = collections.deque()
+        self.not_empty = asyncio.Event()
+        self.not_full = asyncio.Event()
+        self.not_full.set()
+
+    async def put(self, priority: MessagePriority, topic: Optional[str], payload: bytes) -> None:
+        if priority == MessagePriority.MQTT_REGISTER:
+            self.register.append((priority, topic, payload))
+        else:
+            while self.maxsize and len(self.readings) >= self.maxsize:
+                self.not_full.clear()
+                await self.not_full.wait()
+            self.readings.append((priority, topic, payload))
+        self.not_empty.set()
+
+    def put_back(self, messages: list[Message]) -> int:
+        """Returns unpublished messages to the front of the queue, keeping their order.
+        Never blocks: readings that do not fit within maxsize are discarded, oldest first.
+        Returns the number of discarded readings."""
+        discarded = 0
+        for message in reversed(messages):
+            if message[0] == MessagePriority.MQTT_REGISTER:
+                self.register.appendleft(message)
+            elif self.maxsize and len(self.readings) >= self.maxsize:
+                discarded += 1
+            else:
+                self.readings.appendleft(message)
+        if messages:
+            self.not_empty.set()
+        return discarded
+
+    def get_nowait(self) -> Message:
+        """Raises asyncio.QueueEmpty if there is nothing to publish"""
+        if self.register:
+            return self.register.popleft()
+        if self.readings:
+            self.not_full.set()
+            return self.readings.popleft()
+        raise asyncio.QueueEmpty()
+
+    async def get(self) -> Message:
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                self.not_empty.clear()
+                await self.not_empty.wait()
+
+
 @dataclass(slots=True)
 class State:
     transport: str = decouple.config("MQTT_TRANSPORT")
@@ -57,16 +135,42 @@ class State:
     log_level: int = 0
     protocol_log_level: int = 0
     timeout: int = 1800
+    batch_delay: float = BATCH_DELAY
+    fingerprint: Optional[bytes] = None
 
     def update(self, options: dict[str, Any]) -> None:
-        """Updates the mutable state"""
-
-        self.keepalive = options["keepalive"]
-        self.timeout = options["timeout"]
-        self.log_level = logger.level(options["log_level"])
+        """Updates the mutable state, unless options are the same as last time"""
+        # Serialized rather than hashed, as TOML arrays and tables are not hashable
+        fingerprint = orjson.dumps(options, option=orjson.OPT_SORT_KEYS)
+        if fingerprint == self.fingerprint:
+            return
+        # Validate everything before changing anything
+        keepalive = options["keepalive"]
+        timeout = options["timeout"]
+        batch_delay = options.get("batch_delay", BATCH_DELAY)
+        log_level = logger.level(options["log_level"])
+        protocol_log_level = logger.level(options["protocol_log_level"])
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.batch_delay = batch_delay
+        self.log_level = log_level
         log.setLevel(self.log_level)
-        self.protocol_log_level = logger.level(options["protocol_log_level"])
+        self.protocol_log_level = protocol_log_level
         proto_log.setLevel(self.protocol_log_level)
+        self.fingerprint = fingerprint
+
+
+@dataclass(slots=True)
+class Stats:
+    num_published: int = 0
+    num_dropped: int = 0  # readings left unsampled for a whole Tx period (stuck sampler)
+
+    def show(self) -> None:
+        log.info("MQTT Stats [Published, Dropped] = [%d, %d]", self.num_published, self.num_dropped)
+
+    def reset(self) -> None:
+        self.num_published = 0
+        self.num_dropped = 0
 
 
 # ----------------
@@ -76,19 +180,37 @@ class State:
 log = logging.getLogger(logger.LogSpace.MQTT.value)
 proto_log = logging.getLogger("MQTT")
 state = State()
+stats = Stats()
 
 # -----------------
 # Auxiliar functions
 # ------------------
 
 
+def on_client_reload(options: dict[str, Any]) -> None:
+    state.update(options)
+    log.info("Reloaded configuration")
+
+
+def publish(
+    client: aiomqtt.Client, priority: MessagePriority, topic: Optional[str], payload: bytes
+) -> Coroutine[Any, Any, None]:
+    if priority == MessagePriority.MQTT_REGISTER:
+        return client.publish(
+            state.topic_register, payload=payload, qos=REGISTER_QOS, timeout=PUBLISH_TIMEOUT
+        )
+    # Only register messages leave the topic to the MQTT task, readings always carry one
+    topic = cast(str, topic)
+    return client.publish(topic, payload=payload, qos=READINGS_QOS, timeout=PUBLISH_TIMEOUT)
+
+
 # --------------
 # The MQTT task
 # --------------
 
 
-async def publisher(options: dict[str, Any], queue: asyncio.PriorityQueue) -> None:
-    interval = 5
+async def publisher(options: dict[str, Any], queue: PublishQueue) -> None:
+    attempt = 0
     state.update(options)
     log.setLevel(state.log_level)
     client = aiomqtt.Client(
@@ -105,13 +227,41 @@ async def publisher(options: dict[str, Any], queue: asyncio.PriorityQueue) -> No
     while True:
         try:
             async with client:
-                get_future = queue.get()
-                priority, _, message = await asyncio.wait_for(get_future, state.timeout)
-                payload = json.dumps(message)
-                if priority == MessagePriority.MQTT_REGISTER:
-                    await client.publish(state.topic_register, payload=payload)
-                else:
-                    await client.publish(f"STARS4ALL/{message['name']}/reading", payload=payload)
+                # Keep the session open and publish as long as the connection lasts
+                while True:
+                    async with asyncio.timeout(state.timeout):
+                        batch = [await queue.get()]
+                    # Registers go out at once, readings linger a bit to coalesce with others
+                    if batch[0][0] == MessagePriority.MQTT_READINGS and state.batch_delay > 0:
+                        await asyncio.sleep(state.batch_delay)
+                    # Drain whatever else is already waiting, in priority order
+                    while len(batch) < BATCH_SIZE:
+                        try:
+                            batch.append(queue.get_nowait())
+                        except asyncio.QueueEmpty:
+                            break
+                    results = await asyncio.gather(
+                        *(publish(client, *message) for message in batch), return_exceptions=True
+                    )
+                    errors = [res for res in results if isinstance(res, BaseException)]
+                    stats.num_published += len(batch) - len(errors)
+                    if errors:
+                        # Publish them again once reconnected
+                        failed = [m for m, r in zip(batch, results) if isinstance(r, BaseException)]
+                        discarded = queue.put_back(failed)
+                        if discarded:
+                            log.warning("Queue full, discarding %d unpublished readings", discarded)
+                        if isinstance(errors[0], asyncio.CancelledError):
+                            # Not this task being cancelled, as gather() would have raised it
+                            raise aiomqtt.MqttError("Publish cancelled") from errors[0]
+                        raise errors[0]
+                    # Only a successful publish proves the broker is really back
+                    attempt = 0
         except aiomqtt.MqttError:
-            log.warning(f"Connection lost; Reconnecting in {interval} seconds ...")
-            await asyncio.sleep(interval)
+            # Exponential backoff with full jitter, so that clients do not reconnect all at once
+            delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+            # Stop growing once capped, so that a long outage never overflows the float
+            if BACKOFF_BASE * 2**attempt < BACKOFF_CAP:
+                attempt += 1
+            log.warning("Connection lost; Reconnecting in %.1f seconds ...", delay)
+            await asyncio.sleep(delay)
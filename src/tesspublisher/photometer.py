@@ -4,25 +4,65 @@
 # See the LICENSE file for details
 # ----------------------------------------------------------------------
 
-import json
+import math
+import time
 import logging
 import asyncio
-import collections
+import itertools
 
 from logging import Logger
-from asyncio import PriorityQueue
-from datetime import datetime, timezone, timedelta
 from typing import AsyncIterator, Optional, Any, Union
 
+import orjson
+import decouple
+
 from . import transport, logger
 from .constants import MessagePriority
 from .model import PhotometerInfo
+from .mqtt import PublishQueue, stats
 from .transport import SerialTransport, TCPProtocol
 
 # ----------------
 # Global variables
 # ----------------
 
+# Timestamps are rounded to the nearest second
+HALF_SECOND = 0.5
+
+# Fully parse every incoming line. Set to False to trade validation for a cheap structural check,
+# which forwards any line enclosed in braces to the MQTT broker, even if it is not valid JSON
+STRICT_JSON = decouple.config("STRICT_JSON", default=True, cast=bool)
+
+# ------------------
+# Auxiliar functions
+# ------------------
+
+
+def is_json_object(line: bytes) -> bool:
+    """Checks that a raw line is a JSON object before splicing fields into it.
+    Outside strict mode, only checks that the line is enclosed in braces"""
+    if STRICT_JSON:
+        try:
+            return isinstance(orjson.loads(line), dict)
+        except orjson.JSONDecodeError:
+            return False
+    line = line.strip()
+    return line.startswith(b"{") and line.endswith(b"}")
+
+
+def add_fields(line: bytes, tstamp: str, seq: int) -> bytes:
+    """Splices the tstamp and seq fields into a raw JSON object line,
+    avoiding a full parse and re-serialization of the reading"""
+    if b'"tstamp"' in line or b'"seq"' in line:
+        # Overwrite them, as splicing would end up with duplicate keys
+        message = orjson.loads(line)
+        message["tstamp"] = tstamp
+        message["seq"] = seq
+        return orjson.dumps(message)
+    body = line.rstrip()[:-1].rstrip()  # without the closing brace
+    sep = b"" if body.endswith(b"{") else b","
+    return b'%s%s"tstamp":"%s","seq":%d}' % (body, sep, tstamp.encode(), seq)
+
 
 class PhotometerReadings:
     def __init__(
@@ -31,14 +71,14 @@ class PhotometerReadings:
     ):
         self.comm = comm
 
-    def __aiter__(self) -> AsyncIterator[str]:
+    def __aiter__(self) -> AsyncIterator[bytes]:
         """
         Método para inicializar el iterador asíncrono.
         Retorna un AsyncIterator de enteros (puedes cambiar el tipo).
         """
         return aiter(self.comm)
 
-    async def __anext__(self) -> str:
+    async def __anext__(self) -> bytes:
         """
         Método para obtener el siguiente ítem asincrónico.
         Retorna un entero o lanza StopAsyncIteration para finalizar la iteración.
@@ -47,12 +87,10 @@ class PhotometerReadings:
 
 
 class Photometer:
-    token: int = 0  # To break ties in priority queue
-
     def __init__(
         self,
         info: PhotometerInfo,
-        mqtt_queue: PriorityQueue,
+        mqtt_queue: PublishQueue,
     ):
         self.info = info
         self.period = info.period
@@ -60,8 +98,11 @@ class Photometer:
         self.log.setLevel(logger.level(info.log_level))
         self.comm = transport.factory(endpoint=info.endpoint, logger=self.log)
         self.mqtt_queue = mqtt_queue
-        self.queue = collections.deque(maxlen=1)  # ring buffer 1 slot long
-        self.counter = 0
+        self.reading_topic = f"STARS4ALL/{info.name}/reading"
+        self.register_payload = orjson.dumps(info.to_dict())  # never changes
+        # last raw reading and its arrival time, 1 slot long
+        self.latest: Optional[tuple[bytes, float]] = None
+        self.seq = itertools.count()
         self.readings = PhotometerReadings(self.comm)
 
     async def __aenter__(self) -> "Photometer":
@@ -81,53 +122,69 @@ class Photometer:
             await self.comm.close()
         return False
 
-    async def enqueue(self, priority: MessagePriority, message):
-        await self.mqtt_queue.put((MessagePriority.MQTT_REGISTER, Photometer.token, message))
-        Photometer.token += 1
+    async def enqueue(
+        self, priority: MessagePriority, topic: Optional[str], payload: bytes
+    ) -> None:
+        """Payloads are serialized here, so that the MQTT task only has to publish them.
+        Register messages carry no topic, as it is chosen by the MQTT task."""
+        await self.mqtt_queue.put(priority, topic, payload)
 
     async def register(self) -> None:
-        message = self.info.to_dict()
-        self.log.info(message)
-        await self.enqueue(MessagePriority.MQTT_REGISTER, message)
+        if self.log.isEnabledFor(logging.INFO):
+            self.log.info("%s", self.register_payload.decode())
+        await self.enqueue(MessagePriority.MQTT_REGISTER, None, self.register_payload)
         self.log.info("Waiting before sending register message again")
         await asyncio.sleep(5)
-        await self.enqueue(MessagePriority.MQTT_REGISTER, message)
+        await self.enqueue(MessagePriority.MQTT_REGISTER, None, self.register_payload)
 
     async def reader(self) -> None:
         """Photometer reader sub-task"""
-        await self.register()
         async with self:  # Open the device
-            async for message in self.readings:
-                if message:
-                    try:
-                        message = json.loads(message)
-                    except json.decoder.JSONDecodeError:
-                        pass
-                    else:
-                        if isinstance(message, dict):
-                            tstamp = datetime.now(timezone.utc) + timedelta(seconds=0.5)
-                            message["tstamp"] = tstamp.strftime("%Y-%m-%dT%H:%M:%SZ")
-                            self.queue.append(message)  # Internal deque
+            async for line in self.readings:
+                if is_json_object(line):
+                    arrival = time.time()
+                    # Overwrites are normal when decimating, unless a whole period was missed
+                    if self.latest is not None and arrival - self.latest[1] > self.period:
+                        stats.num_dropped += 1
+                    # Only stamped here, formatted when sampled
+                    self.latest = (line, arrival)
 
     async def sampler(self) -> None:
         """Photometer sampler sub-task"""
+        # Sleep until absolute deadlines so that the Tx period does not drift
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         while True:
             try:
-                await asyncio.sleep(self.period)
-                if len(self.queue):
-                    message = self.queue.pop()
-                    message["seq"] = self.counter
-                    self.counter += 1
-                    self.log.info(message)
-                    await self.enqueue(MessagePriority.MQTT_READINGS, message)
+                deadline += self.period
+                now = loop.time()
+                if deadline < now:
+                    # Skip periods missed while blocked on a full queue, keeping the phase
+                    deadline += self.period * math.ceil((now - deadline) / self.period)
+                await asyncio.sleep(deadline - now)
+                latest, self.latest = self.latest, None
+                if latest is not None:
+                    line, arrival = latest
+                    t = time.gmtime(arrival + HALF_SECOND)
+                    tstamp = (
+                        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+                        f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"
+                    )
+                    payload = add_fields(line, tstamp, next(self.seq))
+                    if self.log.isEnabledFor(logging.INFO):
+                        # Readings are not validated outside strict mode and may not be UTF-8
+                        self.log.info("%s", payload.decode(errors="replace"))
+                    await self.enqueue(MessagePriority.MQTT_READINGS, self.reading_topic, payload)
                 else:
                     self.log.warn("missing data. Check %s connection", self.comm.__class__.__name__)
             except Exception as e:
+                # A bad reading must not stop sampling for good
                 self.log.exception(e)
-                break
 
     async def task(self) -> None:
         """Photometer master task"""
         async with asyncio.TaskGroup() as tg:
+            # Registering waits between retransmissions, so it must not delay reading
+            tg.create_task(self.register())
             tg.create_task(self.reader())
             tg.create_task(self.sampler())
@@ -5,14 +5,20 @@ from typing import Union
 import aioserial
 import serial
 
+# Bytes without a line ending after which the serial buffer is discarded (i.e. wrong baud rate)
+MAX_LINE_SIZE = 4096
+
 
 class SerialTransport:
-    def __init__(self, logger: Logger, port: str, baudrate: int):
+    __slots__ = ("log", "port", "baudrate", "newline", "serial", "_buffer")
+
+    def __init__(self, logger: Logger, port: str, baudrate: int, newline: bytes = b"\n"):
         self.log = logger
         self.port = port
         self.baudrate = baudrate
+        self.newline = newline
         self.serial = None
-        self.encoding: str = "utf-8"
+        self._buffer = bytearray()
         self.log.info("Using %s", self.__class__.__name__)
 
     async def open(self) -> None:
@@ -31,40 +37,61 @@ class SerialTransport:
         # The iterator is its own async iterator.
         return self
 
-    async def __anext__(self) -> str:
-        return (await self.serial.readline_async()).decode(self.encoding, errors="replace")
+    async def __anext__(self) -> bytes:
+        # Raw line, as orjson parses bytes directly.
+        # Reads whatever is already waiting in one go, instead of readline()'s byte by byte
+        while True:
+            idx = self._buffer.find(self.newline)
+            if idx != -1:
+                end = idx + len(self.newline)
+                line = bytes(self._buffer[:end])
+                del self._buffer[:end]
+                return line
+            if len(self._buffer) > MAX_LINE_SIZE:
+                self.log.warning("No line ending in %d bytes, discarding them", len(self._buffer))
+                self._buffer.clear()
+            self._buffer += await self.serial.read_async(max(1, self.serial.in_waiting))
 
 
 class TCPProtocol(asyncio.Protocol):
+    __slots__ = (
+        "loop",
+        "log",
+        "host",
+        "port",
+        "newline",
+        "on_conn_lost",
+        "transport",
+        "_buffer",
+        "_lines",
+    )
+
     def __init__(
         self,
         logger: Logger,
         host: str,
         port: int,
         loop: asyncio.AbstractEventLoop | None = None,
-        encoding: str = "utf-8",
         newline: bytes = b"\r\n",
     ) -> None:
         self.loop = loop or asyncio.get_event_loop()
         self.log = logger
         self.host = host
         self.port = port
-        self.encoding = encoding
         self.newline = newline
-        # Futures for external awaiters
-        self.on_data_received: asyncio.Future | None = None
+        # Future for external awaiters
         self.on_conn_lost: asyncio.Future = self.loop.create_future()
         # Internal state
         self.transport: asyncio.Transport | None = None
         self._buffer = bytearray()
+        # Complete lines not yet read. None signals a lost connection
+        self._lines: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=1024)
         self.log.info("Using %s", self.__class__.__name__)
 
     async def open(self) -> None:
         self.log.info("Opening TCP connection to (%s, %s)", self.host, self.port)
         try:
-            transport, self.protocol = await self.loop.create_connection(
-                lambda: self, self.host, self.port
-            )
+            await self.loop.create_connection(lambda: self, self.host, self.port)
         except Exception as e:
             self.log.error(e)
             raise
@@ -76,11 +103,11 @@ class TCPProtocol(asyncio.Protocol):
         # The iterator is its own async iterator.
         return self
 
-    async def __anext__(self) -> str:
-        if self.on_data_received is not None and not self.on_data_received.done():
-            self.on_data_received.cancel()
-        self.on_data_received = self.loop.create_future()
-        return await self.on_data_received
+    async def __anext__(self) -> bytes:
+        message = await self._lines.get()
+        if message is None:
+            raise ConnectionError("Connection lost before incoming message was complete")
+        return message
 
     # asyncio.Protocol callbacks
     def connection_made(self, transport: asyncio.Transport) -> None:
@@ -90,46 +117,34 @@ class TCPProtocol(asyncio.Protocol):
     def data_received(self, data: bytes) -> None:
         # Accumulate incoming bytes
         self._buffer.extend(data)
-        # Process all complete lines currently in buffer
-        while True:
-            idx = self._buffer.find(self.newline)
-            if idx == -1:
-                break  # no full line yet
-            # Extract one line including newline
-            line = self._buffer[: idx + len(self.newline)]
-            del self._buffer[: idx + len(self.newline)]  # delete extracted line from buffer
-            message = line.decode(self.encoding, errors="replace")
-            if (
-                self.on_data_received is not None
-                and not self.on_data_received.cancelled()
-                and not self.on_data_received.done()
-            ):
-                self.on_data_received.set_result(message)
-                # Only fulfill one waiter; caller can call next_message() again.
-                break
+        # Split all complete lines currently in buffer in a single pass.
+        # The last chunk is the trailing incomplete line, kept for the next segment
+        *lines, self._buffer = self._buffer.split(self.newline)
+        for line in lines:
+            message = bytes(line)
+            try:
+                self._lines.put_nowait(message)
+            except asyncio.QueueFull:
+                self.log.warning("Reader not keeping up, discarding line %s", message)
 
     def connection_lost(self, exc: Exception | None) -> None:
         self.log.info("TCP connection lost to (%s, %s) open", self.host, self.port)
         if not self.on_conn_lost.cancelled() and not self.on_conn_lost.done():
             self.on_conn_lost.set_result(True)
-
-        if (
-            self.on_data_received is not None
-            and not self.on_data_received.done()
-            and not self.on_data_received.cancelled()
-        ):
-            self.on_data_received.set_exception(
-                ConnectionError("Connection lost before incoming message was complete")
-            )
+        if self._lines.full():
+            self._lines.get_nowait()  # make room for the end marker
+        self._lines.put_nowait(None)
 
 
-def chop(endpoint: str, sep=":"):
-    """Chop a list of strings, separated by sep and
-    strips individual string items from leading and trailing blanks"""
-    chopped = tuple(elem.strip() for elem in endpoint.split(sep))
-    if len(chopped) == 1 and chopped[0] == "":
-        chopped = tuple()
-    return chopped
+def chop(endpoint: str, sep: str = ":") -> tuple[str, str, str]:
+    """Chop a 'proto:A:B' endpoint string into its three fields, separated by sep,
+    and strips individual fields from leading and trailing blanks"""
+    proto, _, rest = endpoint.partition(sep)
+    A, _, B = rest.partition(sep)
+    proto, A, B = proto.strip(), A.strip(), B.strip()
+    if not (proto and A and B) or sep in B:
+        raise ValueError(f"Invalid endpoint: {endpoint}")
+    return proto, A, B
 
 
 def factory(endpoint: str, logger: Logger) -> Union[TCPProtocol, SerialTransport]:
@@ -139,5 +154,5 @@ def factory(endpoint: str, logger: Logger) -> Union[TCPProtocol, SerialTransport
     elif proto == "tcp":
         comm = TCPProtocol(logger=logger, host=A, port=B)
     else:
-        raise NotImplementedError(f"Unsupported protocol: {proto}")
+        raise NotImplementedError(f"Unsupported protocol {proto} in endpoint: {endpoint}")
     return comm
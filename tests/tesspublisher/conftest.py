@@ -0,0 +1,22 @@
+# ----------------------------------------------------------------------
+# Copyright (c) 2025 Rafael Gonzalez.
+#
+# See the LICENSE file for details
+# ----------------------------------------------------------------------
+
+import os
+
+# The mqtt and http modules read these at import time.
+# Dummy values, so that tests run without a .env file
+for name, value in (
+    ("MQTT_TRANSPORT", "tcp"),
+    ("MQTT_HOST", "localhost"),
+    ("MQTT_PORT", "1883"),
+    ("MQTT_USERNAME", ""),
+    ("MQTT_PASSWORD", ""),
+    ("MQTT_CLIENT_ID", ""),
+    ("MQTT_TOPIC", "foo/bar"),
+    ("ADMIN_HTTP_LISTEN_ADDR", "localhost"),
+    ("ADMIN_HTTP_PORT", "8080"),
+):
+    os.environ.setdefault(name, value)
@@ -0,0 +1,44 @@
+# ----------------------------------------------------------------------
+# Copyright (c) 2025 Rafael Gonzalez.
+#
+# See the LICENSE file for details
+# ----------------------------------------------------------------------
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tesspublisher import http
+from tesspublisher.mqtt import stats
+
+
+@pytest.fixture
+def client(monkeypatch):
+    plogger = logging.getLogger("stars1")
+    monkeypatch.setitem(http._plogger_cache, plogger.name, plogger)
+    return TestClient(http.app)
+
+
+def test_plogger_unknown_level(client):
+    logging.getLogger("stars1").setLevel(15)
+    response = client.get("/v1/ploggers/stars1")
+    assert response.status_code == 200
+    assert response.json() == {"name": "stars1", "level": "debug"}
+    response = client.get("/v1/ploggers")
+    assert response.status_code == 200
+
+
+def test_plogger_not_found(client):
+    assert client.get("/v1/ploggers/stars2").status_code == 404
+
+
+def test_stats(monkeypatch, client):
+    monkeypatch.setattr(stats, "num_published", 3)
+    monkeypatch.setattr(stats, "num_dropped", 1)
+    expected = {"num_published": 3, "num_dropped": 1}
+    # Reading them does not reset them
+    assert client.get("/v1/stats").json() == expected
+    assert client.get("/v1/stats").json() == expected
+    assert client.post("/v1/stats/reset").json() == expected
+    assert client.get("/v1/stats").json() == {"num_published": 0, "num_dropped": 0}
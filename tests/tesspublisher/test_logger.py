@@ -0,0 +1,24 @@
+# ----------------------------------------------------------------------
+# Copyright (c) 2025 Rafael Gonzalez.
+#
+# See the LICENSE file for details
+# ----------------------------------------------------------------------
+
+import logging
+
+import pytest
+
+from tesspublisher.logger import level, level_name
+
+
+@pytest.mark.parametrize("name", ["none", "critical", "error", "warn", "info", "debug", "trace"])
+def test_level_round_trip(name):
+    assert level_name(level(name)) == name
+
+
+@pytest.mark.parametrize(
+    "value, name",
+    [(15, "debug"), (25, "info"), (logging.CRITICAL + 10, "critical"), (1, "none"), (7, "trace")],
+)
+def test_level_name_unknown(value, name):
+    assert level_name(value) == name
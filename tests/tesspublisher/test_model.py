@@ -0,0 +1,100 @@
+# ----------------------------------------------------------------------
+# Copyright (c) 2025 Rafael Gonzalez.
+#
+# See the LICENSE file for details
+# ----------------------------------------------------------------------
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from tesspublisher.model import PhotometerInfo, is_datetime, is_mac_address, is_zero_point
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("AA:BB:CC:DD:EE:FF", "AA:BB:CC:DD:EE:FF"),
+        ("a:b:c:d:e:f", "0A:0B:0C:0D:0E:0F"),
+        (" 1:2:3:4:5:6", "01:02:03:04:05:06"),
+        ("001:02:03:04:05:06", "01:02:03:04:05:06"),
+        ("aa:bb:cc:dd:ee:ff\n", "AA:BB:CC:DD:EE:FF"),
+    ],
+)
+def test_mac_address(value, expected):
+    assert is_mac_address(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value", ["", "1:2:3:4:5", "1:2:3:4:5:6:7", "1:2:3:4:5:G", "1::2:3:4:5", "1:2:3:4:5:100", None]
+)
+def test_mac_address_invalid(value):
+    with pytest.raises(ValueError, match="Invalid MAC"):
+        is_mac_address(value)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2025-01-02T03:04:05",
+        "2025-01-02 03:04:05",
+        "2025-01-02T03:04:05Z",
+        "2025-01-02 03:04:05Z",
+        "2025-01-02T04:04:05+01:00",
+        "2025-01-02 04:04:05+0100",
+    ],
+)
+def test_datetime(value):
+    assert is_datetime(value) == datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def test_datetime_passthrough():
+    now = datetime.now(timezone.utc)
+    assert is_datetime(now) is now
+    assert is_datetime(None).microsecond == 0
+
+
+@pytest.mark.parametrize("value", ["2025-01-02", "yesterday", "2025-01-02T03:04:05.123"])
+def test_datetime_invalid(value):
+    with pytest.raises(ValueError, match="formats"):
+        is_datetime(value)
+
+
+@pytest.mark.parametrize("value, expected", [(20, 20), (20.5, 20.5), ("20.5", 20.5), ("20", 20.0)])
+def test_zero_point(value, expected):
+    zp = is_zero_point(value)
+    assert zp == expected
+    assert type(zp) is type(expected)
+
+
+def test_zero_point_register():
+    info = PhotometerInfo.model_validate(
+        {
+            "name": "stars1",
+            "endpoint": "tcp:192.168.4.1:23",
+            "period": 60,
+            "log_level": "info",
+            "model": "TESS-W",
+            "mac_address": "AA:BB:CC:DD:EE:FF",
+            "zp1": 20,
+            "offset1": 0,
+            "filter1": "UVIR750",
+        }
+    )
+    assert json.dumps(info.to_dict()["calib"]) == "20"
+
+
+def test_zero_point_out_of_bounds():
+    with pytest.raises(ValueError, match="out of bounds"):
+        is_zero_point(31)
+
+
+def test_zero_point_not_a_number():
+    with pytest.raises(ValueError, match="not a number"):
+        is_zero_point("abc")
+
+
+def test_zero_point_unsupported_type():
+    with pytest.raises(ValueError, match="unsupported type"):
+        is_zero_point([20])
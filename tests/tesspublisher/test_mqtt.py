@@ -0,0 +1,155 @@
+# ----------------------------------------------------------------------
+# Copyright (c) 2025 Rafael Gonzalez.
+#
+# See the LICENSE file for details
+# ----------------------------------------------------------------------
+
+import asyncio
+
+import aiomqtt
+import pytest
+
+from tesspublisher import mqtt
+from tesspublisher.constants import MessagePriority
+from tesspublisher.mqtt import PublishQueue, State, stats
+
+REGISTER = MessagePriority.MQTT_REGISTER
+READINGS = MessagePriority.MQTT_READINGS
+
+
+def drain(queue: PublishQueue) -> list[bytes]:
+    payloads = list()
+    while True:
+        try:
+            payloads.append(queue.get_nowait()[2])
+        except asyncio.QueueEmpty:
+            return payloads
+
+
+@pytest.mark.asyncio
+async def test_register_first():
+    queue = PublishQueue()
+    await queue.put(READINGS, "stars1/reading", b"r1")
+    await queue.put(REGISTER, None, b"g1")
+    await queue.put(READINGS, "stars1/reading", b"r2")
+    await queue.put(REGISTER, None, b"g2")
+    assert drain(queue) == [b"g1", b"g2", b"r1", b"r2"]
+
+
+@pytest.mark.asyncio
+async def test_get_waits():
+    queue = PublishQueue()
+    getter = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+    assert not getter.done()
+    await queue.put(READINGS, "stars1/reading", b"r1")
+    assert (await asyncio.wait_for(getter, timeout=1))[2] == b"r1"
+
+
+@pytest.mark.asyncio
+async def test_maxsize_blocks_readings_only():
+    queue = PublishQueue(maxsize=1)
+    await queue.put(READINGS, "stars1/reading", b"r1")
+    putter = asyncio.create_task(queue.put(READINGS, "stars1/reading", b"r2"))
+    await asyncio.sleep(0)
+    assert not putter.done()
+    # Registers are never bounded
+    await asyncio.wait_for(queue.put(REGISTER, None, b"g1"), timeout=1)
+    assert queue.get_nowait()[2] == b"g1"
+    assert queue.get_nowait()[2] == b"r1"
+    await asyncio.wait_for(putter, timeout=1)
+    assert drain(queue) == [b"r2"]
+
+
+@pytest.mark.asyncio
+async def test_put_back():
+    queue = PublishQueue()
+    await queue.put(READINGS, "stars1/reading", b"r3")
+    await queue.put(REGISTER, None, b"g2")
+    failed = [(REGISTER, None, b"g1"), (READINGS, "stars1/reading", b"r1")]
+    failed.append((READINGS, "stars1/reading", b"r2"))
+    assert queue.put_back(failed) == 0
+    assert drain(queue) == [b"g1", b"g2", b"r1", b"r2", b"r3"]
+
+
+@pytest.mark.asyncio
+async def test_put_back_maxsize():
+    queue = PublishQueue(maxsize=2)
+    await queue.put(READINGS, "stars1/reading", b"r3")
+    failed = [(REGISTER, None, b"g1"), (READINGS, "stars1/reading", b"r1")]
+    failed.append((READINGS, "stars1/reading", b"r2"))
+    # Registers always go back, the oldest readings are discarded
+    assert queue.put_back(failed) == 1
+    assert drain(queue) == [b"g1", b"r2", b"r3"]
+
+
+def test_state_update():
+    options = {
+        "keepalive": 60,
+        "timeout": 1800,
+        "log_level": "info",
+        "protocol_log_level": "info",
+        "topics": ["foo/bar"],
+        "extra": {"key": [1, 2]},
+    }
+    state = State()
+    state.update(options)
+    assert state.keepalive == 60
+    fingerprint = state.fingerprint
+    state.update(dict(reversed(options.items())))
+    assert state.fingerprint == fingerprint
+    state.update({**options, "keepalive": 30})
+    assert state.keepalive == 30
+
+
+class FakeClient:
+    """Fails the first publish of some payloads, in the given way"""
+
+    published: list[bytes] = list()
+    failures: dict[bytes, BaseException] = dict()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self) -> "FakeClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def publish(self, topic: str, payload: bytes, qos: int, timeout: float) -> None:
+        await asyncio.sleep(0)
+        error = self.failures.pop(payload, None)
+        if error is not None:
+            raise error
+        self.published.append(payload)
+
+
+@pytest.mark.asyncio
+async def test_publisher_retries_failed(monkeypatch):
+    monkeypatch.setattr(mqtt.aiomqtt, "Client", FakeClient)
+    monkeypatch.setattr(mqtt, "BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(stats, "num_published", 0)
+    monkeypatch.setattr(FakeClient, "published", list())
+    failures = {b"g1": aiomqtt.MqttError("lost"), b"r1": asyncio.CancelledError()}
+    monkeypatch.setattr(FakeClient, "failures", failures)
+    options = {
+        "keepalive": 60,
+        "timeout": 1800,
+        "batch_delay": 0,
+        "log_level": "info",
+        "protocol_log_level": "info",
+    }
+    queue = PublishQueue()
+    await queue.put(REGISTER, None, b"g1")
+    await queue.put(READINGS, "stars1/reading", b"r1")
+    await queue.put(READINGS, "stars1/reading", b"r2")
+    publisher = asyncio.create_task(mqtt.publisher(options, queue))
+    try:
+        async with asyncio.timeout(1):
+            while len(FakeClient.published) < 3:
+                await asyncio.sleep(0.01)
+    finally:
+        publisher.cancel()
+    assert sorted(FakeClient.published) == [b"g1", b"r1", b"r2"]
+    assert stats.num_published == 3
@@ -0,0 +1,116 @@
+# ----------------------------------------------------------------------
+# Copyright (c) 2025 Rafael Gonzalez.
+#
+# See the LICENSE file for details
+# ----------------------------------------------------------------------
+
+import time
+import asyncio
+
+import orjson
+import pytest
+import pytest_asyncio
+
+from tesspublisher import photometer
+from tesspublisher.model import PhotometerInfo
+from tesspublisher.mqtt import PublishQueue, stats
+from tesspublisher.photometer import Photometer, add_fields, is_json_object
+from tesspublisher.transport import TCPProtocol
+
+TSTAMP = "2025-01-02T03:04:05Z"
+
+INFO = {
+    "name": "stars478",
+    "endpoint": "tcp:192.168.4.1:23",
+    "period": 60,
+    "log_level": "info",
+    "model": "TESS-W",
+    "mac_address": "AA:BB:CC:DD:EE:FF",
+    "zp1": 20.5,
+    "offset1": 0,
+    "filter1": "UVIR750",
+}
+
+
+@pytest_asyncio.fixture
+async def phot():
+    phot = Photometer(info=PhotometerInfo.model_validate(INFO), mqtt_queue=PublishQueue())
+    phot.period = 0.01  # speeds up the sampler
+    return phot
+
+
+@pytest.mark.parametrize("line", [b'{"freq":1.5,"mag":20.1}', b'{"freq":1.5,"mag":20.1}\r\n'])
+def test_add_fields(line):
+    payload = add_fields(line, TSTAMP, 7)
+    assert orjson.loads(payload) == {"freq": 1.5, "mag": 20.1, "tstamp": TSTAMP, "seq": 7}
+
+
+def test_add_fields_overwrites():
+    payload = add_fields(b'{"seq":3,"tstamp":"x","mag":1}\r\n', TSTAMP, 7)
+    assert payload == b'{"seq":7,"tstamp":"%s","mag":1}' % TSTAMP.encode()
+
+
+def test_add_fields_empty_object():
+    assert orjson.loads(add_fields(b"{ }\n", TSTAMP, 0)) == {"tstamp": TSTAMP, "seq": 0}
+
+
+@pytest.mark.parametrize("strict", [True, False])
+@pytest.mark.parametrize("line", [b'{"freq":1.5}', b'{"freq":1.5}\r\n', b"{}"])
+def test_json_object(monkeypatch, strict, line):
+    monkeypatch.setattr(photometer, "STRICT_JSON", strict)
+    assert is_json_object(line)
+
+
+@pytest.mark.parametrize("strict", [True, False])
+@pytest.mark.parametrize("line", [b"", b"\r\n", b"garbage", b"[1, 2]", b'{"freq":1.5'])
+def test_not_json_object(monkeypatch, strict, line):
+    monkeypatch.setattr(photometer, "STRICT_JSON", strict)
+    assert not is_json_object(line)
+
+
+@pytest.mark.parametrize("line", [b"{garbage}", b'{"a":1}{"b":2}', b'{"band":"UV"},"F2":{}'])
+def test_strict_json_object(monkeypatch, line):
+    monkeypatch.setattr(photometer, "STRICT_JSON", True)
+    assert not is_json_object(line)
+
+
+@pytest.mark.parametrize("strict", [True, False])
+def test_not_utf8_json_object(monkeypatch, strict):
+    monkeypatch.setattr(photometer, "STRICT_JSON", strict)
+    # Only the structural check lets it through
+    assert is_json_object(b'{"mag":\xff}') is not strict
+
+
+@pytest.mark.asyncio
+async def test_sampler_survives_not_utf8(phot):
+    sampler = asyncio.create_task(phot.sampler())
+    try:
+        phot.latest = (b'{"mag":\xff}', time.time())
+        _, _, payload = await asyncio.wait_for(phot.mqtt_queue.get(), timeout=1)
+        assert payload.startswith(b'{"mag":\xff,"tstamp":')
+        phot.latest = (b'{"mag":20.1}', time.time())
+        _, _, payload = await asyncio.wait_for(phot.mqtt_queue.get(), timeout=1)
+        assert orjson.loads(payload)["mag"] == 20.1
+    finally:
+        sampler.cancel()
+
+
+@pytest.mark.asyncio
+async def test_reader_counts_unsampled(monkeypatch, phot):
+    clock = [0.0]
+
+    async def readings():
+        # Decimating readings, then one arriving after the sampler missed a period
+        for clock[0] in (0.0, 0.005, 0.009, 0.05):
+            yield b'{"mag":20.1}'
+
+    async def noop(self):
+        pass
+
+    monkeypatch.setattr(TCPProtocol, "open", noop)
+    monkeypatch.setattr(photometer.time, "time", lambda: clock[0])
+    monkeypatch.setattr(stats, "num_dropped", 0)
+    phot.readings = readings()
+    await phot.reader()
+    assert stats.num_dropped == 1
+    assert phot.latest == (b'{"mag":20.1}', 0.05)
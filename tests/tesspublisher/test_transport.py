@@ -0,0 +1,116 @@
+# ----------------------------------------------------------------------
+# Copyright (c) 2025 Rafael Gonzalez.
+#
+# See the LICENSE file for details
+# ----------------------------------------------------------------------
+
+import asyncio
+import logging
+
+import pytest
+import pytest_asyncio
+
+from tesspublisher import transport
+from tesspublisher.transport import SerialTransport, TCPProtocol, chop
+
+log = logging.getLogger(__name__)
+
+
+@pytest_asyncio.fixture
+async def proto():
+    return TCPProtocol(log, "localhost", 2000, loop=asyncio.get_running_loop())
+
+
+class FakeSerial:
+    """Hands out the given chunks, as read_async() would"""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = list(chunks)
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.chunks[0]) if self.chunks else 0
+
+    async def read_async(self, size: int) -> bytes:
+        chunk = self.chunks[0][:size]
+        self.chunks[0] = self.chunks[0][size:]
+        if not self.chunks[0]:
+            self.chunks.pop(0)
+        return chunk
+
+
+def serial_transport(*chunks: bytes) -> SerialTransport:
+    comm = SerialTransport(log, "/dev/ttyUSB0", 9600)
+    comm.serial = FakeSerial(*chunks)
+    return comm
+
+
+async def next_line(proto: TCPProtocol | SerialTransport) -> bytes:
+    return await asyncio.wait_for(anext(proto), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_two_lines_in_one_segment(proto):
+    proto.data_received(b'{"seq":1}\r\n{"seq":2}\r\n')
+    assert await next_line(proto) == b'{"seq":1}'
+    assert await next_line(proto) == b'{"seq":2}'
+    assert proto._lines.empty()
+
+
+@pytest.mark.asyncio
+async def test_partial_trailing_line(proto):
+    proto.data_received(b'{"seq":1}\r\n{"se')
+    assert await next_line(proto) == b'{"seq":1}'
+    assert proto._lines.empty()
+    proto.data_received(b'q":2}\r')
+    assert proto._lines.empty()
+    proto.data_received(b"\n")
+    assert await next_line(proto) == b'{"seq":2}'
+
+
+@pytest.mark.asyncio
+async def test_connection_lost_end_marker(proto):
+    proto.data_received(b'{"seq":1}\r\n')
+    proto.connection_lost(None)
+    assert proto.on_conn_lost.done()
+    assert await next_line(proto) == b'{"seq":1}'
+    with pytest.raises(ConnectionError):
+        await next_line(proto)
+
+
+@pytest.mark.asyncio
+async def test_connection_lost_on_full_queue(proto):
+    for i in range(proto._lines.maxsize):
+        proto.data_received(b"%d\r\n" % i)
+    proto.connection_lost(None)
+    for i in range(1, proto._lines.maxsize):
+        assert await next_line(proto) == b"%d" % i
+    with pytest.raises(ConnectionError):
+        await next_line(proto)
+
+
+def test_chop():
+    assert chop("tcp:192.168.4.1:23") == ("tcp", "192.168.4.1", "23")
+    assert chop(" serial : /dev/ttyUSB0 : 9600 ") == ("serial", "/dev/ttyUSB0", "9600")
+
+
+@pytest.mark.parametrize("endpoint", ["", "tcp", "tcp:host", "tcp::23", ":host:23", "tcp:a:b:c"])
+def test_chop_invalid(endpoint):
+    with pytest.raises(ValueError, match="Invalid endpoint"):
+        chop(endpoint)
+
+
+@pytest.mark.asyncio
+async def test_serial_lines():
+    comm = serial_transport(b'{"seq":1}\n{"seq":2}\n{"se', b'q":3}', b"\n")
+    assert await next_line(comm) == b'{"seq":1}\n'
+    assert await next_line(comm) == b'{"seq":2}\n'
+    assert await next_line(comm) == b'{"seq":3}\n'
+
+
+@pytest.mark.asyncio
+async def test_serial_no_line_ending(monkeypatch):
+    monkeypatch.setattr(transport, "MAX_LINE_SIZE", 16)
+    comm = serial_transport(b"\xff" * 10, b"\xff" * 10, b'{"seq":1}\n')
+    assert await next_line(comm) == b'{"seq":1}\n'
+    assert len(comm._buffer) == 0